@@ -96,6 +96,8 @@
 # 02/19/2021 2.52 Randy Johnson    Fixed bug in execute_sql() where table list was not           #
 #                                  initialized.                                                  #
 # 02/22/2021 2.53 Randy Johnson    Changed table from list of lists to list of tuples.           #
+# 10/19/2026 2.54 Randy Johnson    Added OpenAwrMirror(), RunSqlite(), SqliteDate() and the      #
+#                                  StdDev class for the local AWR mirror (awr_mirror).           #
 ##################################################################################################
 
 # --------------------------------------
@@ -108,6 +110,7 @@ from getpass      import getpass
 from math         import floor
 from math         import log
 from math         import pow
+from math         import sqrt
 from subprocess   import PIPE
 from subprocess   import Popen
 from subprocess   import STDOUT
@@ -137,6 +140,9 @@ from sys          import version_info
 from signal       import SIGPIPE
 from signal       import SIG_DFL
 from signal       import signal
+from sqlite3      import connect as SqliteConnect
+from sqlite3      import Error as SqliteError
+from textwrap     import wrap
 from time         import strptime
 from time         import sleep
 
@@ -3334,6 +3340,212 @@ def FormatNumber(s, tSep=',', dSep='.'):
 # End FormatNumber()
 # ---------------------------------------------------------------------------
 
+# ---------------------------------------------------------------------------
+# Clas: StdDev
+# Desc: STDDEV() aggregate for SQLite: the sample standard deviation, 0 for
+#       a single value and NULL for none, as in Oracle.
+# ---------------------------------------------------------------------------
+class StdDev:
+  def __init__(self):
+    self.values = []
+
+  def step(self, value):
+    if (value != None):
+      self.values.append(float(value))
+
+  def finalize(self):
+    if (len(self.values) == 0):
+      return(None)
+    if (len(self.values) == 1):
+      return(0.0)
+    mean = sum(self.values) / len(self.values)
+    return(sqrt(sum([ (x - mean) ** 2 for x in self.values ]) / (len(self.values) - 1)))
+# ---------------------------------------------------------------------------
+# End StdDev
+# ---------------------------------------------------------------------------
+
+# ---------------------------------------------------------------------------
+# Def : OpenAwrMirror()
+# Desc: Opens the local AWR mirror maintained by awr_mirror, a SQLite copy
+#       of the DBA_HIST_* rows the AWR scripts report on. The tables carry
+#       the names (and the column names) of the views they mirror so the
+#       --local queries of the AWR scripts read like their sqlplus
+#       counterparts. Times are stored as 'YYYY-MM-DD HH24:MI:SS' text.
+#       The mirror file is MirrorFile, else $AWR_MIRROR, else
+#       awr_mirror.<ORACLE_SID>.db in /home/oracle/dba/log (or the current
+#       directory when that doesn't exist).
+# Args: MirrorFile, Create (True = create the mirror if it doesn't exist)
+# Retn: Conn (sqlite3 connection)
+# ---------------------------------------------------------------------------
+def OpenAwrMirror(MirrorFile='', Create=False):
+  if (MirrorFile == '' and 'AWR_MIRROR' in list(environ.keys())):
+    MirrorFile = environ['AWR_MIRROR']
+  if (MirrorFile == ''):
+    if (not('ORACLE_SID' in list(environ.keys()))):
+      print('ORACLE_SID (or AWR_MIRROR) is required.')
+      exit(1)
+    LogDir = '/home/oracle/dba/log'
+    if (not isdir(LogDir)):
+      LogDir = '.'
+    MirrorFile = pathjoin(LogDir, 'awr_mirror.' + environ['ORACLE_SID'] + '.db')
+
+  if (not Create and not isfile(MirrorFile)):
+    print('\nAWR mirror not found: %s' % MirrorFile)
+    print('Run awr_mirror to create it.')
+    exit(1)
+
+  try:
+    Conn = SqliteConnect(MirrorFile)
+    Conn.create_aggregate('STDDEV', 1, StdDev)
+    if (Create):
+      Conn.execute('CREATE TABLE IF NOT EXISTS awr_mirror_db (dbid INTEGER PRIMARY KEY, db_name TEXT, refreshed TEXT)')
+      Conn.execute('CREATE TABLE IF NOT EXISTS awr_mirror_hwm (dbid INTEGER, instance_number INTEGER, snap_id INTEGER, PRIMARY KEY (dbid, instance_number))')
+      Conn.execute('CREATE TABLE IF NOT EXISTS dba_hist_snapshot (dbid INTEGER, instance_number INTEGER, snap_id INTEGER, startup_time TEXT,'
+                   ' begin_interval_time TEXT, end_interval_time TEXT, PRIMARY KEY (dbid, instance_number, snap_id))')
+      Conn.execute('CREATE TABLE IF NOT EXISTS dba_hist_sys_time_model (dbid INTEGER, instance_number INTEGER, snap_id INTEGER, value INTEGER, stat_name TEXT)')
+      Conn.execute('CREATE TABLE IF NOT EXISTS dba_hist_sqlstat (dbid INTEGER, instance_number INTEGER, snap_id INTEGER, sql_id TEXT, plan_hash_value INTEGER,'
+                   ' force_matching_signature TEXT, executions_delta INTEGER, elapsed_time_delta INTEGER, cpu_time_delta INTEGER, buffer_gets_delta INTEGER,'
+                   ' disk_reads_delta INTEGER, rows_processed_delta INTEGER, io_offload_elig_bytes_delta INTEGER, io_interconnect_bytes_delta INTEGER)')
+      Conn.execute('CREATE TABLE IF NOT EXISTS dba_hist_active_sess_history (dbid INTEGER, instance_number INTEGER, snap_id INTEGER, sample_id INTEGER,'
+                   ' sample_time TEXT, session_id INTEGER, session_serial INTEGER, session_type TEXT, user_id INTEGER, sql_id TEXT, sql_plan_hash_value INTEGER,'
+                   ' wait_class TEXT, delta_time INTEGER, delta_read_io_requests INTEGER, delta_write_io_requests INTEGER, delta_read_io_bytes INTEGER,'
+                   ' delta_write_io_bytes INTEGER, delta_interconnect_io_bytes INTEGER, pga_allocated INTEGER, temp_space_allocated INTEGER, event TEXT)')
+      Conn.execute('CREATE TABLE IF NOT EXISTS dba_hist_sqltext (dbid INTEGER, sql_id TEXT, sql_text TEXT, PRIMARY KEY (dbid, sql_id))')
+      Conn.execute('CREATE TABLE IF NOT EXISTS dba_users (dbid INTEGER, user_id INTEGER, username TEXT, PRIMARY KEY (dbid, user_id))')
+      Conn.execute('CREATE TABLE IF NOT EXISTS dba_sql_profiles (dbid INTEGER, signature TEXT, name TEXT)')
+      Conn.execute('CREATE INDEX IF NOT EXISTS sys_time_model_snap ON dba_hist_sys_time_model (dbid, instance_number, snap_id, stat_name)')
+      Conn.execute('CREATE INDEX IF NOT EXISTS sqlstat_snap  ON dba_hist_sqlstat (dbid, instance_number, snap_id)')
+      Conn.execute('CREATE INDEX IF NOT EXISTS sqlstat_sql   ON dba_hist_sqlstat (sql_id)')
+      Conn.execute('CREATE INDEX IF NOT EXISTS sqlstat_fms   ON dba_hist_sqlstat (force_matching_signature)')
+      Conn.execute('CREATE INDEX IF NOT EXISTS ash_snap      ON dba_hist_active_sess_history (dbid, instance_number, snap_id)')
+      Conn.execute('CREATE INDEX IF NOT EXISTS ash_time      ON dba_hist_active_sess_history (sample_time)')
+      Conn.execute('CREATE INDEX IF NOT EXISTS sql_profiles_sig ON dba_sql_profiles (signature)')
+  except SqliteError as e:
+    print('\nERROR: Cannot open AWR mirror %s: %s' % (MirrorFile, e))
+    exit(1)
+
+  return(Conn)
+# ---------------------------------------------------------------------------
+# End OpenAwrMirror()
+# ---------------------------------------------------------------------------
+
+# ---------------------------------------------------------------------------
+# Def : SqliteDate()
+# Desc: Converts a date string in one of the formats accepted by
+#       ValidateDate() to the 'YYYY-MM-DD HH24:MI:SS' text the AWR mirror
+#       stores, so they compare as Oracle dates would.
+# Args: DateStr
+# Retn: 'YYYY-MM-DD HH24:MI:SS' ('' if DateStr is not a valid date)
+# ---------------------------------------------------------------------------
+def SqliteDate(DateStr):
+  for Format in ('%Y-%m-%d %H:%M:%S', '%Y-%m-%d %H:%M', '%Y-%m-%d %H', '%Y-%m-%d'):
+    try:
+      return(datetime.strptime(DateStr, Format).strftime('%Y-%m-%d %H:%M:%S'))
+    except ValueError:
+      pass
+
+  return('')
+# ---------------------------------------------------------------------------
+# End SqliteDate()
+# ---------------------------------------------------------------------------
+
+# ---------------------------------------------------------------------------
+# Def : RunSqlite()
+# Desc: Runs a query in SQLite and formats the result the way sqlplus
+#       would. Column formats and headings are taken from the sqlplus
+#       'column ... format ... heading' commands in Format (usually the
+#       sqlplus version of the same report). 'set heading off' or
+#       'set pagesize 0' in Format suppresses the heading.
+# Args: Conn, Sql, Format
+# Retn: Stdout (string, the formatted report; '' if no rows)
+# ---------------------------------------------------------------------------
+def RunSqlite(Conn, Sql, Format=''):
+  ColFormats = {}
+  Heading    = True
+  for Line in Format.split('\n'):
+    MatchObj = match(r"\s*col(umn)?\s+(\S+)\s*(.*)$", Line, IGNORECASE)
+    if (MatchObj):
+      Attrs = MatchObj.group(3)
+      Fmt   = search(r"\bfor(mat)?\s+(\S+)", Attrs, IGNORECASE)
+      Hdg   = search(r"\bheading\s+'([^']*)'", Attrs, IGNORECASE)
+      ColFormats[MatchObj.group(2).lower()] = (Fmt.group(2).lower() if Fmt else '', Hdg.group(1) if Hdg else None, 'word_wrap' in Attrs.lower())
+    elif (match(r"\s*set\s+(heading\s+off|pagesize\s+0\s*$)", Line, IGNORECASE)):
+      Heading = False
+
+  try:
+    Cur  = Conn.execute(Sql)
+    Rows = Cur.fetchall()
+  except SqliteError as e:
+    print('\n%s\n\nERROR: %s' % (Sql, e))
+    exit(1)
+
+  if (Rows == []):
+    return('')
+
+  # Work out the width, alignment and rendering of each column...
+  Cols = []
+  for i in range(len(Cur.description)):
+    Name = Cur.description[i][0].lower()
+    (Fmt, Hdg, WordWrap) = ColFormats.get(Name, ('', None, False))
+    if (Hdg == None):
+      Hdg = Name.upper()
+    Values  = [ Row[i] for Row in Rows if Row[i] != None ]
+    Numeric = Values != [] and not [ Value for Value in Values if isinstance(Value, str) ]
+    if (Fmt[:1] in ('9', '0', '$')):
+      Numeric = True
+      Width   = max(len(Fmt) + 1, len(Hdg))
+    elif (Fmt[:1] == 'a'):
+      Numeric = False
+      Width   = int(Fmt[1:])
+      Hdg     = Hdg[:Width]
+    elif (Numeric):
+      Width   = max(15, len(Hdg))
+    else:
+      Width   = max([ len(str(Value)) for Value in Values ] + [len(Hdg)])
+    Cols.append((Fmt, Hdg, WordWrap, Numeric, Width))
+
+  Out = []
+  if (Heading):
+    Out.append(' '.join([ Hdg.rjust(Width) if Numeric else Hdg.ljust(Width) for (Fmt, Hdg, WordWrap, Numeric, Width) in Cols ]).rstrip())
+    Out.append(' '.join([ '-' * Width for (Fmt, Hdg, WordWrap, Numeric, Width) in Cols ]))
+
+  for Row in Rows:
+    Cells = []
+    for i in range(len(Cols)):
+      (Fmt, Hdg, WordWrap, Numeric, Width) = Cols[i]
+      Value = Row[i]
+      if (Value == None):
+        Cells.append([''])
+      elif (Numeric and Fmt != '' and not isinstance(Value, str)):
+        Decimals = len(Fmt.split('.')[1]) if '.' in Fmt else 0
+        Text     = (('{0:,.%df}' if ',' in Fmt else '{0:.%df}') % Decimals).format(float(Value))
+        Cells.append([Text if len(Text) <= Width else '#' * Width])
+      elif (Numeric and not isinstance(Value, str)):
+        Cells.append([str(Value) if isinstance(Value, int) or Value != int(Value) else str(int(Value))])
+      else:
+        Text = str(Value)
+        if (len(Text) <= Width):
+          Cells.append([Text])
+        elif (WordWrap):
+          Cells.append(wrap(Text, Width))
+        else:
+          Cells.append([ Text[j:j+Width] for j in range(0, len(Text), Width) ])
+    Lines = max([ len(Cell) for Cell in Cells ])
+    for j in range(Lines):
+      Line = []
+      for i in range(len(Cols)):
+        (Fmt, Hdg, WordWrap, Numeric, Width) = Cols[i]
+        Text = Cells[i][j] if j < len(Cells[i]) else ''
+        Line.append(Text.rjust(Width) if Numeric else Text.ljust(Width))
+      Out.append(' '.join(Line).rstrip())
+    if (Lines > 1):
+      Out.append('')
+
+  return('\n'.join(Out).rstrip())
+# ---------------------------------------------------------------------------
+# End RunSqlite()
+# ---------------------------------------------------------------------------
+
 
 # ---------------------------------------------------------------------------
 # Def : RunDgmgrl()